@@ -1,4 +1,5 @@
 from .api import AndroidAPI
+from .base import close_sandbox_session
 from .errors import (
     GraphMethodException,
     IncorrectPassword,
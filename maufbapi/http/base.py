@@ -27,7 +27,7 @@ import pkgutil
 import random
 import time
 
-from aiohttp import ClientResponse, ClientSession
+from aiohttp import ClientResponse, ClientSession, DummyCookieJar
 from aiohttp.client import _RequestContextManager
 from yarl import URL
 import aiohttp
@@ -50,9 +50,26 @@ except ImportError:
 T = TypeVar("T")
 
 
+_sandbox_session: ClientSession | None = None
+
+
+def _get_sandbox_session() -> ClientSession:
+    global _sandbox_session
+    if _sandbox_session is None or _sandbox_session.closed:
+        # The session is shared so that connections to the CDN can be reused,
+        # but cookies are never stored, so downloads still don't share any state.
+        _sandbox_session = ClientSession(cookie_jar=DummyCookieJar())
+    return _sandbox_session
+
+
+async def close_sandbox_session() -> None:
+    if _sandbox_session is not None:
+        await _sandbox_session.close()
+
+
 @asynccontextmanager
 async def sandboxed_get(url: URL) -> _RequestContextManager:
-    async with ClientSession() as sess, sess.get(url) as resp:
+    async with _get_sandbox_session().get(url) as resp:
         yield resp
 
 
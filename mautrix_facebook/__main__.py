@@ -15,11 +15,12 @@
 # along with this program.  If not, see <https://www.gnu.org/licenses/>.
 from __future__ import annotations
 
-from typing import Any
+from typing import Any, AsyncIterable, Awaitable
 import asyncio
 import logging
 import time
 
+from maufbapi.http import close_sandbox_session
 from mautrix.bridge import Bridge
 from mautrix.types import RoomID, UserID
 
@@ -97,11 +98,13 @@ class MessengerBridge(Bridge):
             user.stop_listen()
             user.stop_backfill_tasks()
         self.add_shutdown_actions(user.save() for user in User.by_mxid.values())
+        self.add_shutdown_actions(close_sandbox_session())
 
     async def start(self) -> None:
-        self.add_startup_actions(User.init_cls(self))
+        user_startup = User.init_cls(self)
         self.add_startup_actions(Puppet.init_cls(self))
         Portal.init_cls(self)
+        self.add_startup_actions(self._load_portals_and_start_users(user_startup))
         if self.config["bridge.resend_bridge_info"]:
             self.add_startup_actions(self.resend_bridge_info())
         await super().start()
@@ -113,6 +116,17 @@ class MessengerBridge(Bridge):
                 PresenceUpdater.refresh_periodically()
             )
 
+    async def _load_portals_and_start_users(
+        self, user_startup: AsyncIterable[Awaitable[bool]]
+    ) -> None:
+        # Load all portals before connecting users, so events from Facebook find them in the cache
+        try:
+            await Portal.load_all()
+        except Exception:
+            # Lookups keep falling back to the database if not everything was loaded
+            self.log.exception("Failed to preload portals")
+        await asyncio.gather(*[startup async for startup in user_startup])
+
     async def resend_bridge_info(self) -> None:
         self.config["bridge.resend_bridge_info"] = False
         self.config.save()
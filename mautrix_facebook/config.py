@@ -138,6 +138,8 @@ class Config(BaseBridgeConfig):
         copy("bridge.mute_bridging")
         copy("bridge.tag_only_on_create")
         copy("bridge.sandbox_media_download")
+        copy("bridge.reupload_concurrency")
+        copy("bridge.participant_sync_concurrency")
 
         copy_dict("bridge.permissions")
 
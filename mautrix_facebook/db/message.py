@@ -77,6 +77,11 @@ class Message:
     async def delete_all_by_room(cls, room_id: RoomID) -> None:
         await cls.db.execute("DELETE FROM message WHERE mx_room=$1", room_id)
 
+    @classmethod
+    async def delete_all_by_fbid(cls, fbid: str, fb_receiver: int) -> None:
+        q = "DELETE FROM message WHERE fbid=$1 AND fb_receiver=$2"
+        await cls.db.execute(q, fbid, fb_receiver)
+
     @classmethod
     async def get_by_mxid(cls, mxid: EventID, mx_room: RoomID) -> Message | None:
         q = f"SELECT {cls.columns} FROM message WHERE mxid=$1 AND mx_room=$2"
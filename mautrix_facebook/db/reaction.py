@@ -21,7 +21,7 @@ from asyncpg import Record
 from attr import dataclass
 
 from mautrix.types import EventID, RoomID
-from mautrix.util.async_db import Database
+from mautrix.util.async_db import Database, Scheme
 
 fake_db = Database.create("") if TYPE_CHECKING else None
 
@@ -98,20 +98,50 @@ class Reaction:
             self.mx_timestamp,
         )
 
-    async def insert(self) -> None:
+    _insert_query = (
+        "INSERT INTO reaction (mxid, mx_room, fb_msgid, fb_receiver, fb_sender, reaction, mx_timestamp) "
+        "VALUES ($1, $2, $3, $4, $5, $6, $7)"
+    )
+
+    @classmethod
+    async def bulk_insert(cls, reactions: list[Reaction]) -> None:
+        columns = [
+            "mxid",
+            "mx_room",
+            "fb_msgid",
+            "fb_receiver",
+            "fb_sender",
+            "reaction",
+            "mx_timestamp",
+        ]
+        records = [reaction._values for reaction in reactions]
+        # Reactions that are already in the database are skipped instead of failing the batch
+        async with cls.db.acquire() as conn, conn.transaction():
+            if cls.db.scheme == Scheme.POSTGRES:
+                await conn.execute(
+                    "CREATE TEMPORARY TABLE reaction_bulk_insert (LIKE reaction) ON COMMIT DROP"
+                )
+                await conn.copy_records_to_table(
+                    "reaction_bulk_insert", records=records, columns=columns
+                )
+                column_names = ", ".join(columns)
+                await conn.execute(
+                    f"INSERT INTO reaction ({column_names}) "
+                    f"SELECT {column_names} FROM reaction_bulk_insert ON CONFLICT DO NOTHING"
+                )
+            else:
+                await conn.executemany(f"{cls._insert_query} ON CONFLICT DO NOTHING", records)
+
+    async def upsert(self) -> None:
         q = (
             "INSERT INTO reaction (mxid, mx_room, fb_msgid, fb_receiver, fb_sender, reaction, mx_timestamp) "
-            "VALUES ($1, $2, $3, $4, $5, $6, $7)"
+            "VALUES ($1, $2, $3, $4, $5, $6, $7) "
+            "ON CONFLICT (fb_msgid, fb_receiver, fb_sender) DO UPDATE "
+            "SET mxid=excluded.mxid, mx_room=excluded.mx_room, reaction=excluded.reaction, "
+            "    mx_timestamp=excluded.mx_timestamp"
         )
         await self.db.execute(q, *self._values)
 
     async def delete(self) -> None:
         q = "DELETE FROM reaction WHERE fb_msgid=$1 AND fb_receiver=$2 AND fb_sender=$3"
         await self.db.execute(q, self.fb_msgid, self.fb_receiver, self.fb_sender)
-
-    async def save(self) -> None:
-        q = (
-            "UPDATE reaction SET mxid=$1, mx_room=$2, reaction=$6, mx_timestamp=$7 "
-            "WHERE fb_msgid=$3 AND fb_receiver=$4 AND fb_sender=$5"
-        )
-        await self.db.execute(q, *self._values)
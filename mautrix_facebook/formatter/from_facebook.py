@@ -16,6 +16,7 @@
 from __future__ import annotations
 
 from typing import Match
+from functools import lru_cache
 from html import escape
 import re
 
@@ -120,6 +121,29 @@ def _handle_codeblock_post(
             output.append(_convert_formatting(post_cb_content))
 
 
+# The same short messages (e.g. "ok" or emoji) are sent over and over again, and the conversion
+# only depends on the text, so cache it. Mentions are resolved separately after this.
+@lru_cache(maxsize=256)
+def _convert_markdown(html: str) -> str:
+    output = []
+    if html:
+        codeblock = False
+        blockquote = False
+        line: str
+        lines = html.split("\n")
+        for i, line in enumerate(lines):
+            blockquote, line = _handle_blockquote(output, blockquote, line)
+            codeblock, line, post_args = _handle_codeblock_pre(output, codeblock, line)
+            output.append(_convert_formatting(line))
+            if i != len(lines) - 1:
+                if codeblock:
+                    output.append("\n")
+                else:
+                    output.append("<br/>")
+            _handle_codeblock_post(output, *post_args)
+    return "".join(output)
+
+
 async def facebook_to_matrix(msg: graphql.MessageText | mqtt.Message) -> TextMessageEventContent:
     if isinstance(msg, mqtt.Message):
         text = msg.text
@@ -144,24 +168,7 @@ async def facebook_to_matrix(msg: graphql.MessageText | mqtt.Message) -> TextMes
         text = f"{text[:m.offset]}@{m.user_id}\u2063{original}\u2063{text[m.offset + m.length:]}"
     text = utf16_surrogate.remove(text)
 
-    html = escape(text)
-    output = []
-    if html:
-        codeblock = False
-        blockquote = False
-        line: str
-        lines = html.split("\n")
-        for i, line in enumerate(lines):
-            blockquote, line = _handle_blockquote(output, blockquote, line)
-            codeblock, line, post_args = _handle_codeblock_pre(output, codeblock, line)
-            output.append(_convert_formatting(line))
-            if i != len(lines) - 1:
-                if codeblock:
-                    output.append("\n")
-                else:
-                    output.append("<br/>")
-            _handle_codeblock_post(output, *post_args)
-    html = "".join(output)
+    html = _convert_markdown(escape(text))
 
     mention_user_map = {}
     for fbid in mention_user_ids:
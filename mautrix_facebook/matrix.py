@@ -111,6 +111,7 @@ class MatrixHandler(BaseMatrixHandler):
         portal = await po.Portal.get_by_mxid(room_id)
         if not portal:
             return
+        portal.handle_matrix_member_removed(user_id)
 
         user = await u.User.get_by_mxid(user_id, create=False)
         if not user:
@@ -118,6 +119,22 @@ class MatrixHandler(BaseMatrixHandler):
 
         await portal.handle_matrix_leave(user)
 
+    @staticmethod
+    async def _handle_member_removed(room_id: RoomID, user_id: UserID) -> None:
+        portal = await po.Portal.get_by_mxid(room_id)
+        if portal:
+            portal.handle_matrix_member_removed(user_id)
+
+    async def handle_kick(
+        self, room_id: RoomID, user_id: UserID, kicked_by: UserID, reason: str, event_id: EventID
+    ) -> None:
+        await self._handle_member_removed(room_id, user_id)
+
+    async def handle_ban(
+        self, room_id: RoomID, user_id: UserID, banned_by: UserID, reason: str, event_id: EventID
+    ) -> None:
+        await self._handle_member_removed(room_id, user_id)
+
     @staticmethod
     async def handle_redaction(
         room_id: RoomID, user_id: UserID, event_id: EventID, redaction_event_id: EventID
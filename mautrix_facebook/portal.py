@@ -16,17 +16,20 @@
 from __future__ import annotations
 
 from typing import TYPE_CHECKING, Any, AsyncGenerator, Awaitable, Literal, Pattern, Tuple, cast
-from collections import deque
 from html import escape
 from io import BytesIO
+from urllib.parse import unquote
+from weakref import WeakValueDictionary
 import asyncio
 import base64
+import functools
 import hashlib
 import json
 import mimetypes
 import re
 import time
 
+from aiohttp import ClientResponse
 from yarl import URL
 
 from maufbapi.http.errors import RateLimitExceeded
@@ -51,6 +54,7 @@ from mautrix.types import (
     MediaMessageEventContent,
     Membership,
     MemberStateEventContent,
+    MessageEvent,
     MessageEventContent,
     MessageStatus,
     MessageStatusReason,
@@ -79,6 +83,9 @@ from .db import (
     UserPortal as UserPortal,
 )
 from .formatter import facebook_to_matrix, matrix_to_facebook
+from .util.bounded_dict import BoundedDict
+from .util.bounded_set import BoundedSet
+from .util.media import MIME_SNIFF_SIZE, can_stream, stream_upload
 
 if TYPE_CHECKING:
     from .__main__ import MessengerBridge
@@ -95,13 +102,36 @@ except ImportError:
 
 geo_uri_regex: Pattern = re.compile(r"^geo:(-?\d+.\d+),(-?\d+.\d+)$")
 
+NOT_FOUND_CACHE_TTL = 10
+# Seconds to keep redacting as the main intent after a sender wasn't allowed to redact
+REDACT_FORBIDDEN_TTL = 5 * 60
+# Content types from the CDN that are specific enough to use without sniffing the file
+TRUSTED_MIME_PREFIXES = ("image/", "video/", "audio/")
+# Number of members to kick or make leave at once when cleaning up a room
+CLEANUP_CONCURRENCY = 10
+LOCATION_HTML_TEMPLATE = "<p>Location: <a href='{url}'>{text}</a></p>"
 
-class FakeLock:
-    async def __aenter__(self) -> None:
-        pass
 
-    async def __aexit__(self, exc_type, exc, tb) -> None:
-        pass
+# Reactions are almost always one of a handful of emojis, so cache the variation selector
+# normalization instead of running the translation on every reaction event.
+@functools.lru_cache(maxsize=256)
+def fb_to_matrix_reaction(reaction: str) -> str:
+    return variation_selector.add(reaction)
+
+
+@functools.lru_cache(maxsize=256)
+def matrix_to_fb_reaction(reaction: str) -> str:
+    # Facebook doesn't use variation selectors, Matrix does
+    return variation_selector.remove(reaction)
+
+
+# The same avatar URLs come up repeatedly when syncing chats and members
+@functools.lru_cache(maxsize=1024)
+def _parse_photo_id(url: str) -> str:
+    # Only the last path segment is needed, so don't bother parsing the whole URL. The path is
+    # still percent-decoded like URL.path, so stored photo IDs stay the same.
+    path = unquote(url.split("?", 1)[0].split("#", 1)[0])
+    return path[path.rfind("/") + 1 :]
 
 
 StateBridge = EventType.find("m.bridge", EventType.Class.STATE)
@@ -117,18 +147,40 @@ class Portal(DBPortal, BasePortal):
     invite_own_puppet_to_pm: bool = False
     by_mxid: dict[RoomID, Portal] = {}
     by_fbid: dict[tuple[int, int], Portal] = {}
+    # Expiry times of recent lookups that didn't find a portal. Entries are removed when a portal
+    # is inserted or saved with a room, so portals that are created later are found regardless.
+    _not_found: BoundedDict[RoomID | tuple[int, int], float] = BoundedDict(maxlen=4096)
+    # Set once every portal in the database has been loaded at startup. Portals are added to
+    # by_mxid whenever they're saved with a room (including DMs started from Matrix in
+    # accept_matrix_dm), so after that a by_mxid miss doesn't need to check the database.
+    _all_loaded: bool = False
+    # Matrix URIs of chat photos that were already reuploaded, keyed by photo ID
+    _photo_mxc_cache: BoundedDict[str, ContentURI] = BoundedDict(maxlen=1024)
+    # Unencrypted sticker uploads by sticker ID. The futures are stored right away, so that
+    # concurrent messages with the same sticker wait for the same upload.
+    _sticker_cache: BoundedDict[int, asyncio.Future] = BoundedDict(maxlen=256)
     matrix: m.MatrixHandler
     config: Config
     private_chat_portal_meta: Literal["default", "always", "never"]
     disable_reply_fallbacks: bool
+    participant_sync_concurrency: int
 
+    is_direct: bool
     _main_intent: IntentAPI | None
     _create_room_lock: asyncio.Lock
-    _dedup: deque[str]
+    _reupload_semaphore: asyncio.Semaphore
+    _dedup: BoundedSet[str]
     _oti_dedup: dict[int, DBMessage]
-    _send_locks: dict[int, asyncio.Lock]
-    _noop_lock: FakeLock = FakeLock()
+    _recent_events: BoundedDict[EventID, MessageEvent]
+    _recent_messages: BoundedDict[str, DBMessage]
+    _recent_reactions: BoundedDict[tuple[str, int], DBReaction]
+    _reaction_mxids: BoundedSet[EventID]
+    _send_locks: WeakValueDictionary[int, asyncio.Lock]
     _typing: set[UserID]
+    _own_puppet_joined: bool
+    _last_photo_url: str | None
+    _pending_reads: dict[int, DBMessage]
+    _redact_forbidden: dict[int, float]
     _sleeping_to_resync: bool
     _scheduled_resync: asyncio.Task | None
     _resync_targets: dict[int, p.Puppet]
@@ -166,14 +218,23 @@ class Portal(DBPortal, BasePortal):
             next_batch_id,
             historical_base_insertion_event_id,
         )
+        self.is_direct = self.fb_type == ThreadType.USER
         self.log = self.log.getChild(self.fbid_log)
 
         self._main_intent = None
         self._create_room_lock = asyncio.Lock()
-        self._dedup = deque(maxlen=100)
+        self._dedup = BoundedSet(maxlen=100)
         self._oti_dedup = {}
-        self._send_locks = {}
+        self._recent_events = BoundedDict(maxlen=256)
+        self._recent_messages = BoundedDict(maxlen=1024)
+        self._recent_reactions = BoundedDict(maxlen=512)
+        self._reaction_mxids = BoundedSet(maxlen=1000)
+        self._send_locks = WeakValueDictionary()
         self._typing = set()
+        self._own_puppet_joined = False
+        self._last_photo_url = None
+        self._pending_reads = {}
+        self._redact_forbidden = {}
         self._sleeping_to_resync = False
         self._scheduled_resync = None
         self._resync_targets = {}
@@ -189,13 +250,81 @@ class Portal(DBPortal, BasePortal):
         cls.invite_own_puppet_to_pm = cls.config["bridge.invite_own_puppet_to_pm"]
         cls.private_chat_portal_meta = cls.config["bridge.private_chat_portal_meta"]
         cls.disable_reply_fallbacks = cls.config["bridge.disable_reply_fallbacks"]
+        cls.participant_sync_concurrency = cls.config["bridge.participant_sync_concurrency"]
+        cls._reupload_semaphore = asyncio.Semaphore(cls.config["bridge.reupload_concurrency"])
+
+    @classmethod
+    async def cleanup_room(
+        cls,
+        intent: IntentAPI,
+        room_id: RoomID,
+        message: str = "Cleaning room",
+        puppets_only: bool = False,
+    ) -> None:
+        if not puppets_only and cls.bridge.homeserver_software.is_hungry:
+            # Hungryserv can delete the whole room in one request
+            await super().cleanup_room(intent, room_id, message, puppets_only)
+            return
+        try:
+            members = await intent.get_room_members(room_id)
+        except MatrixError:
+            members = []
+        # Same as the default implementation, but removing members concurrently
+        sema = asyncio.Semaphore(CLEANUP_CONCURRENCY)
+
+        async def remove_member(user_id: UserID) -> None:
+            async with sema:
+                puppet = await cls.bridge.get_puppet(user_id, create=False)
+                if puppet:
+                    await puppet.default_mxid_intent.leave_room(room_id)
+                    return
+                elif puppets_only:
+                    return
+                custom_puppet = await cls.bridge.get_double_puppet(user_id)
+                if custom_puppet:
+                    try:
+                        await custom_puppet.intent.leave_room(room_id)
+                        await custom_puppet.intent.forget_room(room_id)
+                        return
+                    except MatrixError:
+                        pass
+                try:
+                    await intent.kick_user(room_id, user_id, message)
+                except MatrixError:
+                    pass
+
+        members = [user_id for user_id in members if user_id != intent.mxid]
+        results = await asyncio.gather(*map(remove_member, members), return_exceptions=True)
+        for user_id, result in zip(members, results):
+            if isinstance(result, Exception):
+                cls.log.warning(
+                    f"Failed to remove {user_id} when cleaning up room {room_id}", exc_info=result
+                )
+        try:
+            await intent.leave_room(room_id)
+        except MatrixError:
+            cls.log.warning(f"Failed to leave room {room_id} when cleaning up room", exc_info=True)
 
     # region DB conversion
 
+    async def insert(self) -> None:
+        await super().insert()
+        self._not_found.pop(self.fbid_full, None)
+        if self.mxid:
+            self._not_found.pop(self.mxid, None)
+
+    async def save(self) -> None:
+        await super().save()
+        if self.mxid:
+            self.by_mxid[self.mxid] = self
+            self._not_found.pop(self.mxid, None)
+
     async def delete(self) -> None:
         if self.mxid:
             await DBMessage.delete_all_by_room(self.mxid)
             await DBReaction.delete_all_by_room(self.mxid)
+            self._recent_messages.clear()
+            self._recent_reactions.clear()
             self.by_mxid.pop(self.mxid, None)
         await Backfill.delete_for_portal(self.fbid, self.fb_receiver)
         self.by_fbid.pop(self.fbid_full, None)
@@ -247,10 +376,6 @@ class Portal(DBPortal, BasePortal):
             or (self.encrypted and self.private_chat_portal_meta != "never")
         )
 
-    @property
-    def is_direct(self) -> bool:
-        return self.fb_type == ThreadType.USER
-
     @property
     def main_intent(self) -> IntentAPI:
         if not self._main_intent:
@@ -322,15 +447,23 @@ class Portal(DBPortal, BasePortal):
                 info.thread_key.id,
                 self.fbid,
             )
-        changed = False
-        if not self.is_direct:
-            changed = any(
-                await asyncio.gather(
-                    self._update_name(info.name),
-                    self._update_photo(source, info.image),
-                )
+        if self.is_direct:
+            # The DM portal info comes from the other participant's puppet
+            changed = await self._update_participants(source, info)
+        else:
+            # Don't let e.g. a failed avatar reupload throw away the other changes
+            results = await asyncio.gather(
+                self._update_name(info.name),
+                self._update_photo(source, info.image),
+                self._update_participants(source, info),
+                return_exceptions=True,
             )
-        changed = await self._update_participants(source, info) or changed
+            changed = False
+            for result in results:
+                if isinstance(result, Exception):
+                    self.log.warning("Failed to update part of portal info", exc_info=result)
+                else:
+                    changed = result or changed
         if changed or force_save:
             await self.update_bridge_info()
             await self.save()
@@ -342,8 +475,7 @@ class Portal(DBPortal, BasePortal):
             return None
         elif isinstance(photo, graphql.Picture):
             photo = photo.uri
-        path = URL(photo).path
-        return path[path.rfind("/") + 1 :]
+        return _parse_photo_id(photo)
 
     @classmethod
     async def _reupload_fb_file(
@@ -362,38 +494,53 @@ class Portal(DBPortal, BasePortal):
             raise ValueError("URL not provided")
         headers = {"referer": f"fbapp://{source.state.application.client_id}/{referer}"}
         sandbox = cls.config["bridge.sandbox_media_download"]
+        async_upload = cls.config["homeserver.async_media"]
         cls.log.trace("Reuploading file %s", url)
-        async with source.client.raw_http_get(url, headers=headers, sandbox=sandbox) as resp:
-            length = int(resp.headers["Content-Length"])
-            if length > cls.matrix.media_config.upload_size:
-                raise ValueError("File not available: too large")
-            data = await resp.read()
-        mime = magic.mimetype(data)
-        if convert_audio and mime != "audio/ogg":
-            data = await ffmpeg.convert_bytes(
-                data, ".ogg", output_args=("-c:a", "libopus"), input_mime=mime
+        async with cls._reupload_semaphore:
+            async with source.client.raw_http_get(url, headers=headers, sandbox=sandbox) as resp:
+                length = int(resp.headers["Content-Length"])
+                if length > cls.matrix.media_config.upload_size:
+                    raise ValueError("File not available: too large")
+                mime = resp.content_type
+                if not mime.startswith(TRUSTED_MIME_PREFIXES):
+                    mime = None
+                # Async uploads happen in the background after the response has been closed,
+                # and audio conversion and size detection need the whole file anyway. Compressed
+                # responses don't have a usable length, so they're read into memory too.
+                if not async_upload and not convert_audio and not find_size and can_stream(resp):
+                    return await stream_upload(
+                        resp, intent, mime=mime, filename=filename, encrypt=encrypt
+                    )
+                data = await resp.read()
+            if not mime:
+                mime = magic.mimetype(data[:MIME_SNIFF_SIZE])
+            if convert_audio and mime != "audio/ogg":
+                data = await ffmpeg.convert_bytes(
+                    data, ".ogg", output_args=("-c:a", "libopus"), input_mime=mime
+                )
+                mime = "audio/ogg"
+            info = FileInfo(mimetype=mime, size=len(data))
+            if Image and mime.startswith("image/") and find_size:
+                with Image.open(BytesIO(data)) as img:
+                    width, height = img.size
+                info = ImageInfo(mimetype=mime, size=len(data), width=width, height=height)
+            upload_mime_type = mime
+            decryption_info = None
+            if encrypt and encrypt_attachment:
+                data, decryption_info = await cls.loop.run_in_executor(
+                    None, encrypt_attachment, data
+                )
+                upload_mime_type = "application/octet-stream"
+                filename = None
+            url = await intent.upload_media(
+                data,
+                mime_type=upload_mime_type,
+                filename=filename,
+                async_upload=async_upload,
             )
-            mime = "audio/ogg"
-        info = FileInfo(mimetype=mime, size=len(data))
-        if Image and mime.startswith("image/") and find_size:
-            with Image.open(BytesIO(data)) as img:
-                width, height = img.size
-            info = ImageInfo(mimetype=mime, size=len(data), width=width, height=height)
-        upload_mime_type = mime
-        decryption_info = None
-        if encrypt and encrypt_attachment:
-            data, decryption_info = encrypt_attachment(data)
-            upload_mime_type = "application/octet-stream"
-            filename = None
-        url = await intent.upload_media(
-            data,
-            mime_type=upload_mime_type,
-            filename=filename,
-            async_upload=cls.config["homeserver.async_media"],
-        )
-        if decryption_info:
-            decryption_info.url = url
-        return url, info, decryption_info
+            if decryption_info:
+                decryption_info.url = url
+            return url, info, decryption_info
 
     async def _update_name(self, name: str | None) -> bool:
         if not name:
@@ -413,21 +560,31 @@ class Portal(DBPortal, BasePortal):
         return False
 
     async def _update_photo(self, source: u.User, photo: graphql.Picture | None) -> bool:
+        if photo and photo.uri == self._last_photo_url and self.avatar_set:
+            return False
         photo_id = self.get_photo_id(photo)
+        self._last_photo_url = photo.uri if photo else None
         if self.photo_id != photo_id or not self.avatar_set:
+            photo_changed = self.photo_id != photo_id
             self.photo_id = photo_id
             self.avatar_set = False
             if photo:
-                if self.photo_id != photo_id or not self.avatar_url:
+                if photo_changed or not self.avatar_url:
                     # Reset avatar_url first in case the upload fails
                     self.avatar_url = None
-                    self.avatar_url = await p.Puppet.reupload_avatar(
-                        source,
-                        self.main_intent,
-                        photo.uri,
-                        self.fbid,
-                        use_graph=self.is_direct and (photo.height or 0) < 500,
-                    )
+                    use_graph = self.is_direct and (photo.height or 0) < 500
+                    if not use_graph and photo_id in self._photo_mxc_cache:
+                        self.avatar_url = self._photo_mxc_cache[photo_id]
+                    else:
+                        self.avatar_url = await p.Puppet.reupload_avatar(
+                            source,
+                            self.main_intent,
+                            photo.uri,
+                            self.fbid,
+                            use_graph=use_graph,
+                        )
+                        if not use_graph:
+                            self._photo_mxc_cache[photo_id] = self.avatar_url
             else:
                 self.avatar_url = ContentURI("")
             if self.mxid:
@@ -443,6 +600,7 @@ class Portal(DBPortal, BasePortal):
         if self.photo_id == puppet.photo_id and (self.avatar_set or not self.set_dm_room_metadata):
             return False
         self.photo_id = puppet.photo_id
+        self._last_photo_url = None
         if puppet.photo_mxc:
             self.avatar_url = puppet.photo_mxc
         elif self.photo_id:
@@ -506,10 +664,18 @@ class Portal(DBPortal, BasePortal):
 
     async def _update_participants(self, source: u.User, info: graphql.Thread) -> bool:
         nick_map = info.customization_info.nickname_map if info.customization_info else {}
-        sync_tasks = [
-            self._update_participant(source, pcp, nick_map) for pcp in info.all_participants.nodes
-        ]
-        changed = any(await asyncio.gather(*sync_tasks))
+        participants = {pcp.id: pcp for pcp in info.all_participants.nodes}
+        # Each participant is joined right after its info is synced, but large groups
+        # shouldn't send hundreds of requests to the homeserver at once.
+        sema = asyncio.Semaphore(self.participant_sync_concurrency)
+
+        async def update_participant(pcp: graphql.ParticipantNode) -> bool:
+            async with sema:
+                return await self._update_participant(source, pcp, nick_map)
+
+        changed = any(
+            await asyncio.gather(*(update_participant(pcp) for pcp in participants.values()))
+        )
         return changed
 
     # endregion
@@ -631,12 +797,12 @@ class Portal(DBPortal, BasePortal):
             return
         try:
             self.log.debug("Updating bridge info...")
-            await self.main_intent.send_state_event(
-                self.mxid, StateBridge, self.bridge_info, self.bridge_info_state_key
-            )
+            bridge_info = self.bridge_info
+            state_key = self.bridge_info_state_key
+            await self.main_intent.send_state_event(self.mxid, StateBridge, bridge_info, state_key)
             # TODO remove this once https://github.com/matrix-org/matrix-doc/pull/2346 is in spec
             await self.main_intent.send_state_event(
-                self.mxid, StateHalfShotBridge, self.bridge_info, self.bridge_info_state_key
+                self.mxid, StateHalfShotBridge, bridge_info, state_key
             )
         except Exception:
             self.log.warning("Failed to update bridge info", exc_info=True)
@@ -650,18 +816,12 @@ class Portal(DBPortal, BasePortal):
 
         self.log.debug("Creating Matrix room")
         name: str | None = None
+        bridge_info = self.bridge_info
+        state_key = self.bridge_info_state_key
         initial_state = [
-            {
-                "type": str(StateBridge),
-                "state_key": self.bridge_info_state_key,
-                "content": self.bridge_info,
-            },
+            {"type": str(StateBridge), "state_key": state_key, "content": bridge_info},
             # TODO remove this once https://github.com/matrix-org/matrix-doc/pull/2346 is in spec
-            {
-                "type": str(StateHalfShotBridge),
-                "state_key": self.bridge_info_state_key,
-                "content": self.bridge_info,
-            },
+            {"type": str(StateHalfShotBridge), "state_key": state_key, "content": bridge_info},
         ]
         invites = []
         if self.config["bridge.encryption.default"] and self.matrix.e2ee:
@@ -711,7 +871,6 @@ class Portal(DBPortal, BasePortal):
                 self.log.warning(f"Failed to add bridge bot to new private chat {self.mxid}")
         await self.save()
         self.log.debug(f"Matrix room created: {self.mxid}")
-        self.by_mxid[self.mxid] = self
 
         puppet = await p.Puppet.get_by_custom_mxid(source.mxid)
         await self.main_intent.invite_user(
@@ -1025,7 +1184,7 @@ class Portal(DBPortal, BasePortal):
                     reaction_event.relates_to = RelatesTo(
                         rel_type=RelationType.ANNOTATION,
                         event_id=d_event_id,
-                        key=reaction.reaction,
+                        key=fb_to_matrix_reaction(reaction.reaction),
                     )
                     if intent.api.is_real_user and intent.api.bridge_name is not None:
                         reaction_event[DOUBLE_PUPPET_SOURCE_KEY] = intent.api.bridge_name
@@ -1162,8 +1321,7 @@ class Portal(DBPortal, BasePortal):
             self.log.exception("Failed to store batch message IDs")
 
         try:
-            for reaction in reactions:
-                await reaction.insert()
+            await DBReaction.bulk_insert(reactions)
         except Exception:
             self.log.exception("Failed to store backfilled reactions")
 
@@ -1208,19 +1366,18 @@ class Portal(DBPortal, BasePortal):
     # region Matrix event handling
 
     def require_send_lock(self, user_id: int) -> asyncio.Lock:
-        try:
-            lock = self._send_locks[user_id]
-        except KeyError:
-            lock = asyncio.Lock()
-            self._send_locks[user_id] = lock
+        # The locks are only stored weakly, so they're garbage collected as soon as nobody is
+        # holding or waiting for them anymore.
+        lock = self._send_locks.get(user_id)
+        if lock is None:
+            lock = self._send_locks[user_id] = asyncio.Lock()
         return lock
 
-    def optional_send_lock(self, user_id: int) -> asyncio.Lock | FakeLock:
-        try:
-            return self._send_locks[user_id]
-        except KeyError:
-            pass
-        return self._noop_lock
+    async def wait_send_lock(self, user_id: int) -> None:
+        lock = self._send_locks.get(user_id)
+        if lock is not None and lock.locked():
+            async with lock:
+                pass
 
     async def _send_delivery_receipt(self, event_id: EventID) -> None:
         if event_id and self.config["bridge.delivery_receipts"]:
@@ -1244,7 +1401,7 @@ class Portal(DBPortal, BasePortal):
             message_type=msgtype,
         )
         background_task.create(self._send_message_status(event_id, err=None))
-        await self._send_delivery_receipt(event_id)
+        background_task.create(self._send_delivery_receipt(event_id))
 
     async def _send_bridge_error(
         self,
@@ -1392,14 +1549,19 @@ class Portal(DBPortal, BasePortal):
     ) -> None:
         if message.file and decrypt_attachment:
             data = await self.main_intent.download_media(message.file.url)
-            data = decrypt_attachment(
-                data, message.file.key.key, message.file.hashes.get("sha256"), message.file.iv
+            data = await self.loop.run_in_executor(
+                None,
+                decrypt_attachment,
+                data,
+                message.file.key.key,
+                message.file.hashes.get("sha256"),
+                message.file.iv,
             )
         elif message.url:
             data = await self.main_intent.download_media(message.url)
         else:
             raise NotImplementedError("No file or URL specified")
-        mime = message.info.mimetype or magic.mimetype(data)
+        mime = message.info.mimetype or magic.mimetype(data[:MIME_SNIFF_SIZE])
         dbm = await self._make_dbm(sender, event_id)
         reply_to = None
         reply_to_mxid = message.get_reply_to()
@@ -1480,13 +1642,17 @@ class Portal(DBPortal, BasePortal):
         sender, _ = await self.get_relay_sender(sender, f"redaction {event_id}")
         if not sender:
             raise Exception("not logged in")
-        message = await DBMessage.get_by_mxid(event_id, self.mxid)
+        # Skip the message table lookup if we know the event is a reaction
+        message = None
+        if event_id not in self._reaction_mxids:
+            message = await DBMessage.get_by_mxid(event_id, self.mxid)
         if message:
             if not message.fbid:
                 track(sender, "$unknown_message_fbid")
                 raise NotImplementedError("Tried to redact message whose fbid is unknown")
             try:
                 await message.delete()
+                self._recent_messages.pop(message.fbid, None)
                 await sender.client.unsend(message.fbid)
             except Exception as e:
                 self.log.exception(f"Failed to unsend {message.fbid}")
@@ -1496,6 +1662,7 @@ class Portal(DBPortal, BasePortal):
         reaction = await DBReaction.get_by_mxid(event_id, self.mxid)
         if reaction:
             try:
+                self._recent_reactions.pop((reaction.fb_msgid, reaction.fb_sender), None)
                 await reaction.delete()
                 await sender.client.react(reaction.fb_msgid, None)
             except Exception as e:
@@ -1535,8 +1702,7 @@ class Portal(DBPortal, BasePortal):
         sender, is_relay = await self.get_relay_sender(sender, f"reaction {event_id}")
         if not sender or is_relay:
             raise NotImplementedError("not logged in")
-        # Facebook doesn't use variation selectors, Matrix does
-        reaction = variation_selector.remove(reaction)
+        reaction = matrix_to_fb_reaction(reaction)
 
         async with self.require_send_lock(sender.fbid):
             message = await DBMessage.get_by_mxid(reacting_to, self.mxid)
@@ -1546,7 +1712,7 @@ class Portal(DBPortal, BasePortal):
                 track(sender, "$unknown_message_fbid")
                 raise NotImplementedError("facebook ID of target message is unknown")
 
-            existing = await DBReaction.get_by_fbid(message.fbid, self.fb_receiver, sender.fbid)
+            existing = await self._get_reaction(message.fbid, sender.fbid)
             if existing and existing.reaction == reaction:
                 return
 
@@ -1573,11 +1739,16 @@ class Portal(DBPortal, BasePortal):
                 await user.mqtt.set_typing(self.fbid, typing)
 
     async def handle_matrix_typing(self, users: set[UserID]) -> None:
+        # Typing notifications always contain the full list of typing users,
+        # so most of them don't change anything.
+        if users == self._typing:
+            return
+        started, stopped = users - self._typing, self._typing - users
+        self._typing = users
         await asyncio.gather(
-            self._set_typing(users - self._typing, typing=True),
-            self._set_typing(self._typing - users, typing=False),
+            self._set_typing(started, typing=True),
+            self._set_typing(stopped, typing=False),
         )
-        self._typing = users
 
     # endregion
     # region Facebook event handling
@@ -1588,15 +1759,20 @@ class Portal(DBPortal, BasePortal):
         if self.is_direct and sender.fbid == source.fbid and not sender.is_real_user:
             if self.invite_own_puppet_to_pm and invite:
                 await self.main_intent.invite_user(self.mxid, sender.mxid)
-            elif (
-                await self.az.state_store.get_membership(self.mxid, sender.mxid) != Membership.JOIN
-            ):
-                self.log.warning(
-                    f"Ignoring own {mid} in private chat because own puppet is not in room."
-                )
-                return False
+            elif not self._own_puppet_joined:
+                membership = await self.az.state_store.get_membership(self.mxid, sender.mxid)
+                if membership != Membership.JOIN:
+                    self.log.warning(
+                        f"Ignoring own {mid} in private chat because own puppet is not in room."
+                    )
+                    return False
+                self._own_puppet_joined = True
         return True
 
+    def handle_matrix_member_removed(self, user_id: UserID) -> None:
+        if self.is_direct and p.Puppet.get_id_from_mxid(user_id) == self.fb_receiver:
+            self._own_puppet_joined = False
+
     async def _add_facebook_reply(
         self,
         content: MessageEventContent,
@@ -1605,13 +1781,15 @@ class Portal(DBPortal, BasePortal):
     ) -> None:
         if isinstance(reply_to, graphql.MinimalMessage):
             log_msg_id = reply_to.message_id
-            message = await DBMessage.get_by_fbid(reply_to.message_id, self.fb_receiver)
+            message = await self._get_message_by_fbid(reply_to.message_id)
         elif isinstance(reply_to, mqtt.Message):
             meta = reply_to.metadata
             log_msg_id = f"{meta.id} / {meta.offline_threading_id}"
-            message = await DBMessage.get_by_fbid_or_oti(
-                meta.id, meta.offline_threading_id, self.fb_receiver, meta.sender
-            )
+            message = self._recent_messages.get(meta.id)
+            if not message:
+                message = await DBMessage.get_by_fbid_or_oti(
+                    meta.id, meta.offline_threading_id, self.fb_receiver, meta.sender
+                )
             if message and not message.fbid:
                 self.log.debug(
                     f"Got message ID {meta.id} for offline threading ID "
@@ -1620,6 +1798,8 @@ class Portal(DBPortal, BasePortal):
                 message.fbid = meta.id
                 message.timestamp = meta.timestamp
                 await message.update()
+            if message:
+                self._recent_messages[meta.id] = message
         else:
             return
 
@@ -1636,6 +1816,11 @@ class Portal(DBPortal, BasePortal):
         if not isinstance(content, TextMessageEventContent) or self.disable_reply_fallbacks:
             return
 
+        evt = self._recent_events.get(message.mxid)
+        if evt:
+            content.set_reply(evt)
+            return
+
         try:
             evt = await self.main_intent.get_event(message.mx_room, message.mxid)
         except (MNotFound, MForbidden):
@@ -1659,9 +1844,45 @@ class Portal(DBPortal, BasePortal):
 
         if isinstance(evt.content, TextMessageEventContent):
             evt.content.trim_reply_fallback()
+        # Several replies often target the same message, so don't fetch (and decrypt) it again
+        self._recent_events[evt.event_id] = evt
 
         content.set_reply(evt)
 
+    async def _get_message_by_fbid(self, fbid: str) -> DBMessage | None:
+        # Replies and reactions usually target recent messages, so keep the first part of
+        # recently seen messages around instead of querying the database for each one.
+        try:
+            return self._recent_messages[fbid]
+        except KeyError:
+            pass
+        message = await DBMessage.get_by_fbid(fbid, self.fb_receiver)
+        if message:
+            self._recent_messages[fbid] = message
+        return message
+
+    def _remember_event(
+        self,
+        event_id: EventID,
+        event_type: EventType,
+        sender: UserID,
+        content: TextMessageEventContent,
+        timestamp: int,
+    ) -> None:
+        if self.disable_reply_fallbacks:
+            return
+        # Keep our own copy of recently sent messages, so replies to them can get a reply
+        # fallback without fetching (and possibly decrypting) the event from the homeserver.
+        content.trim_reply_fallback()
+        self._recent_events[event_id] = MessageEvent(
+            type=event_type,
+            room_id=self.mxid,
+            event_id=event_id,
+            sender=sender,
+            timestamp=timestamp,
+            content=content,
+        )
+
     async def handle_facebook_message(
         self,
         source: u.User,
@@ -1714,7 +1935,7 @@ class Portal(DBPortal, BasePortal):
         # Check in-memory queues for duplicates
         if oti in self._oti_dedup:
             dbm = self._oti_dedup.pop(oti)
-            self._dedup.appendleft(msg_id)
+            self._dedup.add(msg_id)
             self.log.debug(
                 f"Got message ID {msg_id} for offline threading ID {oti} / {dbm.mxid}"
                 " (in dedup queue)"
@@ -1729,7 +1950,7 @@ class Portal(DBPortal, BasePortal):
             backfill_reactions(None)
             return
 
-        self._dedup.appendleft(msg_id)
+        self._dedup.add(msg_id)
 
         # Check database for duplicates
         dbm = await DBMessage.get_by_fbid_or_oti(msg_id, oti, self.fb_receiver, sender.fbid)
@@ -1773,11 +1994,12 @@ class Portal(DBPortal, BasePortal):
                 if isinstance(message, graphql.Message)
                 else message.metadata.timestamp
             )
-            event_ids.append(
-                await self._send_message(
-                    intent, content, event_type=event_type, timestamp=timestamp
-                )
+            event_id = await self._send_message(
+                intent, content, event_type=event_type, timestamp=timestamp
             )
+            event_ids.append(event_id)
+            if event_id and isinstance(content, TextMessageEventContent):
+                self._remember_event(event_id, event_type, intent.mxid, content, timestamp)
         event_ids = [event_id for event_id in event_ids if event_id]
         if not event_ids:
             self.log.warning(f"Unhandled Messenger message {msg_id}")
@@ -1793,7 +2015,8 @@ class Portal(DBPortal, BasePortal):
             timestamp=timestamp,
             event_ids=event_ids,
         )
-        await self._send_delivery_receipt(event_ids[-1])
+        self._recent_messages[msg_id] = created_msgs[0]
+        background_task.create(self._send_delivery_receipt(event_ids[-1]))
         if isinstance(message, graphql.Message) and message.message_reactions:
             await self._handle_graphql_reactions(
                 source, created_msgs[0], message.message_reactions, timestamp
@@ -1863,29 +2086,26 @@ class Portal(DBPortal, BasePortal):
         message: mqtt.Message,
         reply_to: mqtt.Message | None,
     ) -> list[ConvertedMessage]:
-        converted: list[ConvertedMessage] = []
+        # The parts don't depend on each other, so convert them concurrently (e.g. fetch the
+        # reply target for the text while attachments are being reuploaded). gather() keeps
+        # the results in order, so the events are still sent as sticker, attachments, text.
+        parts: list[Awaitable[ConvertedMessage | None]] = []
         if message.sticker:
-            converted.append(
-                await self._convert_facebook_sticker(source, intent, message.sticker, reply_to)
-            )
-        if len(message.attachments) > 0:
-            attachment_contents = await asyncio.gather(
-                *[
-                    self._convert_facebook_attachment(
-                        message.metadata.id,
-                        source,
-                        intent,
-                        attachment,
-                        reply_to,
-                        message_text=message.text,
-                    )
-                    for attachment in message.attachments
-                ]
+            parts.append(self._convert_facebook_sticker(source, intent, message.sticker, reply_to))
+        parts += [
+            self._convert_facebook_attachment(
+                message.metadata.id,
+                source,
+                intent,
+                attachment,
+                reply_to,
+                message_text=message.text,
             )
-            converted += [c for c in attachment_contents if c]
+            for attachment in message.attachments
+        ]
         if message.text:
-            converted.append(await self._convert_facebook_text(message, reply_to))
-        return converted
+            parts.append(self._convert_facebook_text(message, reply_to))
+        return [content for content in await asyncio.gather(*parts) if content]
 
     async def _convert_extensible_media(
         self,
@@ -2212,22 +2432,53 @@ class Portal(DBPortal, BasePortal):
         reply_to: graphql.MinimalMessage | mqtt.Message,
     ) -> ConvertedMessage:
         assert source.client
-        resp = await source.client.fetch_stickers([sticker_id], sticker_labels_enabled=True)
-        sticker = resp.nodes[0]
-        url = (sticker.animated_image or sticker.thread_image).uri
-        mxc, info, decryption_info = await self._reupload_fb_file(
-            url, source, intent, encrypt=self.encrypted, find_size=True
-        )
+        if self.encrypted:
+            resp = await source.client.fetch_stickers([sticker_id], sticker_labels_enabled=True)
+            sticker = resp.nodes[0]
+            url = (sticker.animated_image or sticker.thread_image).uri
+            mxc, info, decryption_info = await self._reupload_fb_file(
+                url, source, intent, encrypt=True, find_size=True
+            )
+            label = sticker.label
+        else:
+            mxc, info, label = await self._reupload_fb_sticker(source, intent, sticker_id)
+            decryption_info = None
         content = MediaMessageEventContent(
             url=mxc,
             file=decryption_info,
             info=info,
             msgtype=MessageType.STICKER,
-            body=sticker.label or "",
+            body=label or "",
         )
         await self._add_facebook_reply(content, reply_to)
         return EventType.STICKER, content
 
+    @classmethod
+    async def _reupload_fb_sticker(
+        cls, source: u.User, intent: IntentAPI, sticker_id: int
+    ) -> tuple[ContentURI, FileInfo, str]:
+        existing = cls._sticker_cache.get(sticker_id)
+        if existing:
+            return await existing
+        fut = cls._sticker_cache[sticker_id] = cls.loop.create_future()
+        try:
+            resp = await source.client.fetch_stickers([sticker_id], sticker_labels_enabled=True)
+            sticker = resp.nodes[0]
+            url = (sticker.animated_image or sticker.thread_image).uri
+            mxc, info, _ = await cls._reupload_fb_file(url, source, intent, find_size=True)
+        except BaseException as e:
+            cls._sticker_cache.pop(sticker_id, None)
+            if isinstance(e, asyncio.CancelledError):
+                # Fail the waiters instead of making them look cancelled themselves
+                fut.set_exception(Exception("Sticker upload was cancelled"))
+            else:
+                fut.set_exception(e)
+            # Mark the exception as retrieved in case nobody else was waiting for it
+            fut.exception()
+            raise
+        fut.set_result((mxc, info, sticker.label))
+        return mxc, info, sticker.label
+
     async def _convert_facebook_attachment(
         self,
         msg_id: str,
@@ -2350,7 +2601,9 @@ class Portal(DBPortal, BasePortal):
         )
         # Some clients support formatted body in m.location, so add that as well.
         content["format"] = str(Format.HTML)
-        content["formatted_body"] = f"<p>Location: <a href='{url}'>{text}</a></p"
+        content["formatted_body"] = LOCATION_HTML_TEMPLATE.format(
+            url=escape(url, quote=True), text=escape(text)
+        )
         # TODO find out if locations still have addresses
         # if location.address:
         #     content.body = f"{location.address}\n{content.body}"
@@ -2362,14 +2615,43 @@ class Portal(DBPortal, BasePortal):
     ) -> None:
         if not self.mxid:
             return
-        for message in await DBMessage.get_all_by_fbid(message_id, self.fb_receiver):
+        # The rows may already be gone if the message was redacted on Matrix
+        self._recent_messages.pop(message_id, None)
+        messages = await DBMessage.get_all_by_fbid(message_id, self.fb_receiver)
+        if not messages:
+            return
+        intent = sender.intent_for(self)
+        results = await asyncio.gather(
+            *[
+                self._redact_as(sender, intent, message.mx_room, message.mxid, timestamp=timestamp)
+                for message in messages
+            ],
+            return_exceptions=True,
+        )
+        for message, result in zip(messages, results):
+            if isinstance(result, Exception):
+                self.log.warning(f"Failed to redact {message.mxid} for unsend", exc_info=result)
+        await DBMessage.delete_all_by_fbid(message_id, self.fb_receiver)
+        self._recent_messages.pop(message_id, None)
+
+    async def _redact_as(
+        self,
+        sender: p.Puppet,
+        intent: IntentAPI,
+        room_id: RoomID,
+        event_id: EventID,
+        timestamp: int | None = None,
+    ) -> None:
+        # Senders who weren't allowed to redact in this room are remembered for a while, so
+        # later redactions go straight to the main intent instead of failing first. It expires
+        # in case the sender rejoins or gets permissions.
+        if self._redact_forbidden.get(sender.fbid, 0) < time.monotonic():
             try:
-                await sender.intent_for(self).redact(
-                    message.mx_room, message.mxid, timestamp=timestamp
-                )
+                await intent.redact(room_id, event_id, timestamp=timestamp)
+                return
             except MForbidden:
-                await self.main_intent.redact(message.mx_room, message.mxid, timestamp=timestamp)
-            await message.delete()
+                self._redact_forbidden[sender.fbid] = time.monotonic() + REDACT_FORBIDDEN_TTL
+        await self.main_intent.redact(room_id, event_id, timestamp=timestamp)
 
     async def handle_facebook_seen(self, source: u.User, sender: p.Puppet, timestamp: int) -> None:
         if not self.mxid:
@@ -2379,11 +2661,28 @@ class Portal(DBPortal, BasePortal):
             return
         if not await self._bridge_own_message_pm(source, sender, "read receipt", invite=False):
             return
-        # TODO can we set a timestamp when the read receipt happened?
-        await sender.intent_for(self).mark_read(msg.mx_room, msg.mxid)
-        self.log.debug(
-            f"Handled Messenger read receipt from {sender.fbid} up to {timestamp}/{msg.mxid}"
-        )
+        # Read receipts are sent in the background so that they don't hold up other events.
+        # If more receipts come in while one is being sent, only the newest one is sent after it.
+        send_task_running = sender.fbid in self._pending_reads
+        self._pending_reads[sender.fbid] = msg
+        if not send_task_running:
+            background_task.create(self._send_read_receipts(sender))
+
+    async def _send_read_receipts(self, sender: p.Puppet) -> None:
+        intent = sender.intent_for(self)
+        try:
+            while sender.fbid in self._pending_reads:
+                msg = self._pending_reads[sender.fbid]
+                # TODO can we set a timestamp when the read receipt happened?
+                await intent.mark_read(msg.mx_room, msg.mxid)
+                self.log.debug(
+                    f"Handled Messenger read receipt from {sender.fbid} up to {msg.mxid}"
+                )
+                if self._pending_reads[sender.fbid] is msg:
+                    del self._pending_reads[sender.fbid]
+        except Exception:
+            self.log.exception(f"Failed to bridge read receipt from {sender.fbid}")
+            self._pending_reads.pop(sender.fbid, None)
 
     async def handle_facebook_photo(
         self,
@@ -2395,7 +2694,7 @@ class Portal(DBPortal, BasePortal):
     ) -> None:
         if not self.mxid or self.is_direct or message_id in self._dedup:
             return
-        self._dedup.appendleft(message_id)
+        self._dedup.add(message_id)
         photo_url = await source.client.get_image_url(message_id, new_photo.media_id)
         if not photo_url and new_photo.image_info.uri_map:
             photo_url = list(new_photo.image_info.uri_map.values())[-1]
@@ -2403,7 +2702,12 @@ class Portal(DBPortal, BasePortal):
         if self.photo_id == photo_id:
             return
         self.photo_id = photo_id
-        self.avatar_url, *_ = await self._reupload_fb_file(photo_url, source, sender.intent)
+        self._last_photo_url = None
+        try:
+            self.avatar_url = self._photo_mxc_cache[photo_id]
+        except KeyError:
+            self.avatar_url, *_ = await self._reupload_fb_file(photo_url, source, sender.intent)
+            self._photo_mxc_cache[photo_id] = self.avatar_url
         try:
             event_id = await sender.intent.set_room_avatar(self.mxid, self.avatar_url)
         except IntentError:
@@ -2432,7 +2736,7 @@ class Portal(DBPortal, BasePortal):
     ) -> None:
         if self.name == new_name or message_id in self._dedup:
             return
-        self._dedup.appendleft(message_id)
+        self._dedup.add(message_id)
         self.name = new_name
         if not self.mxid or self.is_direct:
             return
@@ -2467,14 +2771,16 @@ class Portal(DBPortal, BasePortal):
         if isinstance(sender, int):
             sender = await p.Puppet.get_by_fbid(sender)
         dedup_id = f"react_{message_id}_{sender.fbid}_{reaction}"
-        async with self.optional_send_lock(sender.fbid):
-            if dedup_id in self._dedup:
-                self.log.debug(f"Ignoring duplicate reaction from {sender.fbid} to {message_id}")
-                return
-            self._dedup.appendleft(dedup_id)
+        # Wait for any in-progress Matrix->Facebook reaction from the same user to be stored,
+        # so that its echo gets deduplicated by the database check below.
+        await self.wait_send_lock(sender.fbid)
+        if dedup_id in self._dedup:
+            self.log.debug(f"Ignoring duplicate reaction from {sender.fbid} to {message_id}")
+            return
+        self._dedup.add(dedup_id)
 
         if not existing:
-            existing = await DBReaction.get_by_fbid(message_id, self.fb_receiver, sender.fbid)
+            existing = await self._get_reaction(message_id, sender.fbid)
             if existing and existing.reaction == reaction:
                 self.log.debug(
                     f"Ignoring duplicate reaction from {sender.fbid} to {message_id} (db check)"
@@ -2487,7 +2793,7 @@ class Portal(DBPortal, BasePortal):
         intent = sender.intent_for(self)
 
         if not target_message:
-            target_message = await DBMessage.get_by_fbid(message_id, self.fb_receiver)
+            target_message = await self._get_message_by_fbid(message_id)
         if not target_message:
             self.log.debug(f"Ignoring reaction from {sender.fbid} to unknown message {message_id}")
             return
@@ -2496,7 +2802,7 @@ class Portal(DBPortal, BasePortal):
         mxid = await intent.react(
             room_id=target_message.mx_room,
             event_id=target_message.mxid,
-            key=variation_selector.add(reaction),
+            key=fb_to_matrix_reaction(reaction),
             timestamp=timestamp,
         )
         self.log.debug(f"{sender.fbid} reacted to {target_message.mxid} ({message_id}) -> {mxid}")
@@ -2515,28 +2821,34 @@ class Portal(DBPortal, BasePortal):
         reaction: str,
         mx_timestamp: int,
     ) -> None:
+        self._reaction_mxids.add(mxid)
         if existing:
             self.log.debug(
                 f"_upsert_reaction redacting {existing.mxid} and inserting {mxid}"
                 f" (message: {message.mxid})"
             )
             await intent.redact(existing.mx_room, existing.mxid)
-            existing.reaction = reaction
-            existing.mxid = mxid
-            existing.mx_room = message.mx_room
-            existing.mx_timestamp = mx_timestamp
-            await existing.save()
         else:
             self.log.debug(f"_upsert_reaction inserting {mxid} (message: {message.mxid})")
-            await DBReaction(
-                mxid=mxid,
-                mx_room=message.mx_room,
-                fb_msgid=message.fbid,
-                fb_receiver=self.fb_receiver,
-                fb_sender=sender.fbid,
-                reaction=reaction,
-                mx_timestamp=mx_timestamp,
-            ).insert()
+        db_reaction = DBReaction(
+            mxid=mxid,
+            mx_room=message.mx_room,
+            fb_msgid=message.fbid,
+            fb_receiver=self.fb_receiver,
+            fb_sender=sender.fbid,
+            reaction=reaction,
+            mx_timestamp=mx_timestamp,
+        )
+        await db_reaction.upsert()
+        self._recent_reactions[(message.fbid, sender.fbid)] = db_reaction
+
+    async def _get_reaction(self, fb_msgid: str, fb_sender: int) -> DBReaction | None:
+        # Reactions are usually changed or removed soon after they're added,
+        # so check the ones bridged recently before querying the database.
+        try:
+            return self._recent_reactions[(fb_msgid, fb_sender)]
+        except KeyError:
+            return await DBReaction.get_by_fbid(fb_msgid, self.fb_receiver, fb_sender)
 
     async def handle_facebook_reaction_remove(
         self, source: u.User, sender: p.Puppet | int, target: str | DBReaction
@@ -2548,16 +2860,11 @@ class Portal(DBPortal, BasePortal):
         if isinstance(target, DBReaction):
             reaction = target
         else:
-            reaction = await DBReaction.get_by_fbid(target, self.fb_receiver, sender.fbid)
+            reaction = await self._get_reaction(target, sender.fbid)
         if reaction:
-            try:
-                await sender.intent_for(self).redact(reaction.mx_room, reaction.mxid)
-            except MForbidden:
-                await self.main_intent.redact(reaction.mx_room, reaction.mxid)
-            try:
-                self._dedup.remove(f"react_{reaction.fb_msgid}_{sender.fbid}_{reaction.reaction}")
-            except ValueError:
-                pass
+            await self._redact_as(sender, sender.intent_for(self), reaction.mx_room, reaction.mxid)
+            self._dedup.discard(f"react_{reaction.fb_msgid}_{sender.fbid}_{reaction.reaction}")
+            self._recent_reactions.pop((reaction.fb_msgid, reaction.fb_sender), None)
             await reaction.delete()
 
     async def handle_facebook_poll(
@@ -2655,6 +2962,8 @@ class Portal(DBPortal, BasePortal):
                 await self.main_intent.kick_user(
                     self.mxid, removed.mxid, reason=f"Kicked by {sender.name}"
                 )
+        # The bridge's own leave and kick events aren't passed to the Matrix handler
+        self.handle_matrix_member_removed(removed.default_mxid)
 
     # endregion
 
@@ -2679,19 +2988,35 @@ class Portal(DBPortal, BasePortal):
             (await self.get_dm_puppet()).default_mxid_intent if self.is_direct else self.az.intent
         )
 
+    @classmethod
+    def _recently_not_found(cls, key: RoomID | tuple[int, int]) -> bool:
+        expiry = cls._not_found.get(key)
+        if expiry is None:
+            return False
+        elif expiry < time.monotonic():
+            del cls._not_found[key]
+            return False
+        return True
+
+    @classmethod
+    def _mark_not_found(cls, key: RoomID | tuple[int, int]) -> None:
+        cls._not_found[key] = time.monotonic() + NOT_FOUND_CACHE_TTL
+
     @classmethod
     @async_getter_lock
     async def get_by_mxid(cls, mxid: RoomID) -> Portal | None:
-        try:
-            return cls.by_mxid[mxid]
-        except KeyError:
-            pass
+        portal = cls.by_mxid.get(mxid)
+        if portal is not None:
+            return portal
+        if cls._all_loaded or cls._recently_not_found(mxid):
+            return None
 
         portal = cast(cls, await super().get_by_mxid(mxid))
         if portal:
             await portal.postinit()
             return portal
 
+        cls._mark_not_found(mxid)
         return None
 
     @classmethod
@@ -2707,22 +3032,25 @@ class Portal(DBPortal, BasePortal):
         if fb_type:
             fb_receiver = fb_receiver if fb_type == ThreadType.USER else 0
         fbid_full = (fbid, fb_receiver)
-        try:
-            return cls.by_fbid[fbid_full]
-        except KeyError:
-            pass
+        portal = cls.by_fbid.get(fbid_full)
+        if portal is not None:
+            return portal
+        can_create = fb_type and create
+        if not can_create and cls._recently_not_found(fbid_full):
+            return None
 
         portal = cast(cls, await super().get_by_fbid(fbid, fb_receiver))
         if portal:
             await portal.postinit()
             return portal
 
-        if fb_type and create:
+        if can_create:
             portal = cls(fbid=fbid, fb_receiver=fb_receiver, fb_type=fb_type)
             await portal.insert()
             await portal.postinit()
             return portal
 
+        cls._mark_not_found(fbid_full)
         return None
 
     @classmethod
@@ -2747,6 +3075,12 @@ class Portal(DBPortal, BasePortal):
                 await portal.postinit()
                 yield portal
 
+    @classmethod
+    async def load_all(cls) -> None:
+        async for _ in cls.all():
+            pass
+        cls._all_loaded = True
+
     @classmethod
     def get_by_thread(
         cls,
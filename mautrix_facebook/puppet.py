@@ -19,6 +19,7 @@ from typing import TYPE_CHECKING, Any, AsyncGenerator, AsyncIterable, Awaitable,
 from datetime import datetime, timedelta
 import asyncio
 
+from aiohttp import ClientResponse
 from yarl import URL
 
 from maufbapi.types.graphql import Participant, ParticipantType, Picture
@@ -31,6 +32,7 @@ from mautrix.util.simple_template import SimpleTemplate
 from . import matrix as m, portal as p, user as u
 from .config import Config
 from .db import Puppet as DBPuppet
+from .util.media import MIME_SNIFF_SIZE, can_stream, stream_upload
 
 if TYPE_CHECKING:
     from .__main__ import MessengerBridge
@@ -48,6 +50,7 @@ class Puppet(DBPuppet, BasePuppet):
 
     _last_info_sync: datetime | None
     _name_fetch_attempted: bool
+    _update_info_lock: asyncio.Lock
 
     def __init__(
         self,
@@ -80,6 +83,7 @@ class Puppet(DBPuppet, BasePuppet):
         )
         self._last_info_sync = None
         self._name_fetch_attempted = False
+        self._update_info_lock = asyncio.Lock()
 
         self.default_mxid = self.get_mxid_from_id(fbid)
         self.default_mxid_intent = self.az.intent.user(self.default_mxid)
@@ -101,14 +105,15 @@ class Puppet(DBPuppet, BasePuppet):
 
     async def _leave_rooms_with_default_user(self) -> None:
         await super()._leave_rooms_with_default_user()
+        portals = [
+            portal async for portal in p.Portal.get_all_by_receiver(self.fbid) if portal.mxid
+        ]
+        for portal in portals:
+            # The default user just left, and the bridge's own leaves don't reach the Matrix
+            # handler, so the portals have to be told directly.
+            portal.handle_matrix_member_removed(self.default_mxid)
         # Make the user join all private chat portals.
-        await asyncio.gather(
-            *[
-                self.intent.ensure_joined(portal.mxid)
-                async for portal in p.Portal.get_all_by_receiver(self.fbid)
-                if portal.mxid
-            ]
-        )
+        await asyncio.gather(*[self.intent.ensure_joined(portal.mxid) for portal in portals])
 
     def intent_for(self, portal: p.Portal) -> IntentAPI:
         if portal.fbid == self.fbid:
@@ -159,30 +164,34 @@ class Puppet(DBPuppet, BasePuppet):
                 "Fetching user info to fill profile as name is missing during message handling"
             )
             self._name_fetch_attempted = True
-        try:
-            if not info:
-                fetched_users = await source.client.fetch_user_info(self.fbid)
-                if not fetched_users:
-                    self.log.info("no info to update puppet :(")
-                    return self
-                info = fetched_users[0]
-                assert int(info.id) == self.fbid
-            self._last_info_sync = datetime.now()
-            changed = await self.update_contact_info(info)
-            changed = await self._update_name(info) or changed
-            if update_avatar:
-                changed = (
-                    await self._update_photo(
-                        source,
-                        info.profile_pic_large,
-                        allow_graph=info.typename != ParticipantType.INSTAGRAM,
+        # Puppets are in many portals, so several chat syncs often update the same puppet
+        # at once. Serialize them so that the later ones see the earlier results instead of
+        # reuploading the same avatar.
+        async with self._update_info_lock:
+            try:
+                if not info:
+                    fetched_users = await source.client.fetch_user_info(self.fbid)
+                    if not fetched_users:
+                        self.log.info("no info to update puppet :(")
+                        return self
+                    info = fetched_users[0]
+                    assert int(info.id) == self.fbid
+                self._last_info_sync = datetime.now()
+                changed = await self.update_contact_info(info)
+                changed = await self._update_name(info) or changed
+                if update_avatar:
+                    changed = (
+                        await self._update_photo(
+                            source,
+                            info.profile_pic_large,
+                            allow_graph=info.typename != ParticipantType.INSTAGRAM,
+                        )
+                        or changed
                     )
-                    or changed
-                )
-            if changed:
-                await self.save()
-        except Exception:
-            self.log.exception(f"Failed to update info from source {source.fbid}")
+                if changed:
+                    await self.save()
+            except Exception:
+                self.log.exception(f"Failed to update info from source {source.fbid}")
         return self
 
     async def update_contact_info(self, info: Participant | None = None) -> bool:
@@ -247,21 +256,33 @@ class Puppet(DBPuppet, BasePuppet):
         use_graph: bool = True,
     ) -> ContentURI:
         data = None
+        # Async uploads happen after the response has been closed, so they need the whole file
+        stream = not cls.config["homeserver.async_media"]
         if use_graph and source and source.state and source.state.session.access_token:
             graph_url = (source.client.graph_url / str(fbid) / "picture").with_query(
                 {"width": "1000", "height": "1000"}
             )
             async with source.client.raw_http_get(graph_url) as resp:
                 if resp.status < 400:
+                    if stream and can_stream(resp):
+                        return await cls._stream_avatar(resp, intent)
                     data = await resp.read()
         if data is None:
             async with source.client.raw_http_get(url) as resp:
+                if stream and can_stream(resp):
+                    return await cls._stream_avatar(resp, intent)
                 data = await resp.read()
-        mime = magic.mimetype(data)
+        mime = magic.mimetype(data[:MIME_SNIFF_SIZE])
         return await intent.upload_media(
             data, mime_type=mime, async_upload=cls.config["homeserver.async_media"]
         )
 
+    @staticmethod
+    async def _stream_avatar(resp: ClientResponse, intent: IntentAPI) -> ContentURI:
+        mime = resp.content_type if resp.content_type.startswith("image/") else None
+        url, _, _ = await stream_upload(resp, intent, mime=mime)
+        return url
+
     async def _update_photo(
         self, source: u.User, photo: Picture, allow_graph: bool = True
     ) -> bool:
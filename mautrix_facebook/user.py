@@ -98,6 +98,9 @@ except ImportError:
 
 T = TypeVar("T")
 
+# Matrix typing notifications are sent with a 10 second timeout
+TYPING_REFRESH_INTERVAL = 4
+
 BridgeState.human_readable_errors.update(
     {
         "fb-reconnection-error": "Failed to reconnect to Messenger",
@@ -145,6 +148,7 @@ class User(DBUser, BaseUser):
     _sync_error_ts: float
     _sync_error_count: int
     _try_default_seq_id: bool
+    _typing_sent: dict[int, float]
 
     def __init__(
         self,
@@ -196,6 +200,8 @@ class User(DBUser, BaseUser):
         self._last_seq_id_save = 0
         self._seq_id_save_task = None
 
+        self._typing_sent = {}
+
         self._sync_error_count = 0
         self._sync_error_ts = 0
         self._try_default_seq_id = False
@@ -1350,6 +1356,16 @@ class User(DBUser, BaseUser):
 
     @async_time(METRIC_TYPING)
     async def on_typing(self, evt: mqtt_t.TypingNotification) -> None:
+        # Facebook sends typing notifications much more often than the Matrix typing timeout,
+        # so only refresh the Matrix state when it changes or is about to expire.
+        if evt.typing_status:
+            now = time.monotonic()
+            last_sent = self._typing_sent.get(evt.user_id)
+            if last_sent is not None and now - last_sent < TYPING_REFRESH_INTERVAL:
+                return
+            self._typing_sent[evt.user_id] = now
+        elif self._typing_sent.pop(evt.user_id, None) is None:
+            return
         portal = await po.Portal.get_by_fbid(evt.user_id, fb_receiver=self.fbid, create=False)
         if portal and portal.mxid:
             puppet = await pu.Puppet.get_by_fbid(evt.user_id)
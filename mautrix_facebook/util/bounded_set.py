@@ -0,0 +1,55 @@
+# mautrix-facebook - A Matrix-Facebook Messenger puppeting bridge.
+# Copyright (C) 2023 Tulir Asokan
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+from __future__ import annotations
+
+from typing import Generic, Hashable, TypeVar
+
+T = TypeVar("T", bound=Hashable)
+
+
+class BoundedSet(Generic[T]):
+    """
+    A set that only remembers the most recently added ``maxlen`` items.
+
+    This is a drop-in replacement for ``deque(maxlen=...)`` dedup queues with O(1) membership
+    checks. Items are stored as dict keys, so insertion order is kept and the oldest item is
+    evicted first.
+    """
+
+    __slots__ = ("_items", "maxlen")
+
+    _items: dict[T, None]
+    maxlen: int
+
+    def __init__(self, maxlen: int) -> None:
+        self._items = {}
+        self.maxlen = maxlen
+
+    def __contains__(self, item: T) -> bool:
+        return item in self._items
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def add(self, item: T) -> None:
+        if item in self._items:
+            return
+        self._items[item] = None
+        if len(self._items) > self.maxlen:
+            del self._items[next(iter(self._items))]
+
+    def discard(self, item: T) -> None:
+        self._items.pop(item, None)
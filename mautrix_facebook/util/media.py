@@ -0,0 +1,99 @@
+# mautrix-facebook - A Matrix-Facebook Messenger puppeting bridge.
+# Copyright (C) 2022 Tulir Asokan
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+from __future__ import annotations
+
+from typing import AsyncGenerator
+
+from aiohttp import ClientResponse, hdrs
+
+from mautrix.appservice import IntentAPI
+from mautrix.types import ContentURI, EncryptedFile, FileInfo
+from mautrix.util import magic
+
+try:
+    from mautrix.crypto.attachments import async_encrypt_attachment
+except ImportError:
+    async_encrypt_attachment = None
+
+STREAM_CHUNK_SIZE = 64 * 1024
+# libmagic doesn't need more than the first couple of kilobytes to detect the file type
+MIME_SNIFF_SIZE = 2048
+
+
+def can_stream(resp: ClientResponse) -> bool:
+    """Check whether the response's Content-Length can be used as the size of the upload."""
+    # aiohttp decodes compressed bodies, so Content-Length is the encoded size if there's
+    # a Content-Encoding, and passing it to the upload would cut the file short.
+    return bool(resp.content_length) and hdrs.CONTENT_ENCODING not in resp.headers
+
+
+async def stream_upload(
+    resp: ClientResponse,
+    intent: IntentAPI,
+    *,
+    mime: str | None = None,
+    filename: str | None = None,
+    encrypt: bool = False,
+) -> tuple[ContentURI, FileInfo, EncryptedFile | None]:
+    """
+    Upload the body of a response to the Matrix media repo without reading it all into memory.
+
+    The response must stay open until this returns, so this can't be used for async uploads,
+    and :func:`can_stream` must be true for it. If ``mime`` is not given, it's sniffed from
+    the first chunk of the body.
+    """
+    chunks = resp.content.iter_chunked(STREAM_CHUNK_SIZE)
+    head = b""
+    if not mime:
+        async for chunk in chunks:
+            head += chunk
+            if len(head) >= MIME_SNIFF_SIZE:
+                break
+        mime = magic.mimetype(head)
+    size = 0
+
+    async def read_body() -> AsyncGenerator[bytes, None]:
+        nonlocal size
+        if head:
+            size += len(head)
+            yield head
+        async for body_chunk in chunks:
+            size += len(body_chunk)
+            yield body_chunk
+
+    upload_mime_type = mime
+    decryption_info = None
+    data = read_body()
+    if encrypt and async_encrypt_attachment:
+
+        async def encrypt_body() -> AsyncGenerator[bytes, None]:
+            nonlocal decryption_info
+            async for item in async_encrypt_attachment(read_body()):
+                if isinstance(item, EncryptedFile):
+                    decryption_info = item
+                else:
+                    yield item
+
+        data = encrypt_body()
+        upload_mime_type = "application/octet-stream"
+        filename = None
+    # AES-CTR doesn't change the length, so the CDN's Content-Length is valid either way
+    url = await intent.upload_media(
+        data, mime_type=upload_mime_type, filename=filename, size=resp.content_length
+    )
+    if decryption_info:
+        decryption_info.url = url
+    return url, FileInfo(mimetype=mime, size=size), decryption_info
@@ -0,0 +1,99 @@
+import asyncio
+import gzip
+import os
+
+from aiohttp import ClientSession, web
+
+from mautrix_facebook.portal import Portal
+
+BODY = os.urandom(60000)
+
+
+class FakeIntent:
+    def __init__(self) -> None:
+        self.uploaded = b""
+        self.size = None
+
+    async def upload_media(self, data, mime_type=None, filename=None, size=None, **kwargs):
+        if isinstance(data, (bytes, bytearray)):
+            self.uploaded = bytes(data)
+        else:
+            self.uploaded = b"".join([chunk async for chunk in data])
+        self.size = size
+        return "mxc://example.com/media"
+
+
+class FakeClient:
+    def __init__(self, session: ClientSession) -> None:
+        self.session = session
+
+    def raw_http_get(self, url, headers=None, sandbox=False, **kwargs):
+        return self.session.get(url, headers={**(headers or {}), "Accept-Encoding": "gzip"})
+
+
+class FakeSource:
+    class state:
+        class application:
+            client_id = 123
+
+    def __init__(self, session: ClientSession) -> None:
+        self.client = FakeClient(session)
+
+
+class FakeMatrix:
+    class media_config:
+        upload_size = 50 * 1024 * 1024
+
+
+async def _reupload(path: str) -> FakeIntent:
+    async def handle_gzip(_: web.Request) -> web.Response:
+        return web.Response(
+            body=gzip.compress(BODY),
+            headers={"Content-Encoding": "gzip", "Content-Type": "image/png"},
+        )
+
+    async def handle_plain(_: web.Request) -> web.Response:
+        return web.Response(body=BODY, headers={"Content-Type": "image/png"})
+
+    app = web.Application()
+    app.router.add_get("/gzip", handle_gzip)
+    app.router.add_get("/plain", handle_plain)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    intent = FakeIntent()
+    try:
+        async with ClientSession() as session:
+            await Portal._reupload_fb_file(
+                f"http://127.0.0.1:{port}{path}", FakeSource(session), intent
+            )
+    finally:
+        await runner.cleanup()
+    return intent
+
+
+def _setup_portal(monkeypatch) -> None:
+    monkeypatch.setattr(
+        Portal,
+        "config",
+        {"bridge.sandbox_media_download": False, "homeserver.async_media": False},
+        raising=False,
+    )
+    monkeypatch.setattr(Portal, "matrix", FakeMatrix, raising=False)
+    monkeypatch.setattr(Portal, "_reupload_semaphore", asyncio.Semaphore(1), raising=False)
+
+
+def test_reupload_gzip_encoded_response_uploads_full_body(monkeypatch) -> None:
+    _setup_portal(monkeypatch)
+    intent = asyncio.run(_reupload("/gzip"))
+    assert intent.uploaded == BODY
+    assert intent.size in (None, len(BODY))
+
+
+def test_reupload_plain_response_is_streamed(monkeypatch) -> None:
+    _setup_portal(monkeypatch)
+    intent = asyncio.run(_reupload("/plain"))
+    assert intent.uploaded == BODY
+    assert intent.size == len(BODY)